@@ -17,7 +17,11 @@ class A2ABaseModel(BaseModel):
     model_config = ConfigDict(
         populate_by_name=True,
         alias_generator=to_camel,
-        use_enum_values=True
+        use_enum_values=True,
+        # TaskManager mutates models in place on every status update and
+        # version change; keep those writes as plain attribute sets.
+        validate_assignment=False,
+        extra="ignore"
     )
 
 # Enums
@@ -4,17 +4,140 @@ This module provides the TaskManager class to create, retrieve,
 and update tasks in memory. Also manages version history for models.
 """
 
-from typing import Dict, Optional
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+import os
+import threading
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from .models import Task, TaskStatus, TaskState, Message
-from .version_history import ModelVersion, ModelHistory
+from .version_history import ModelVersion, ModelHistory, intern_text
+
+
+# Number of UUIDs generated from each os.urandom call
+_UUID_BATCH_SIZE = 64
+_uuid_pool: List[str] = []
+
+
+def _new_uuid() -> str:
+    """Return a random UUID4 string, drawing entropy for a batch at a time."""
+    try:
+        return _uuid_pool.pop()
+    except IndexError:
+        buf = os.urandom(16 * _UUID_BATCH_SIZE)
+        _uuid_pool.extend(
+            str(uuid.UUID(bytes=buf[i:i + 16], version=4))
+            for i in range(0, len(buf), 16)
+        )
+        return _uuid_pool.pop()
+
+
+# Timestamps requested within this many nanoseconds share one datetime
+_NOW_RESOLUTION_NS = 1_000_000
+_last_now: Tuple[int, Optional[datetime]] = (0, None)
+
+
+def _utcnow() -> datetime:
+    """Return the current UTC time, reusing the last value within the same millisecond."""
+    global _last_now
+    ns = time.time_ns()
+    last_ns, last_dt = _last_now
+    if 0 <= ns - last_ns < _NOW_RESOLUTION_NS:
+        return last_dt
+    now = datetime.fromtimestamp(ns / 1e9, tz=timezone.utc)
+    _last_now = (ns, now)
+    return now
+
+
+# States after which a task is moved out of the live task dict
+_TERMINAL_STATES = frozenset({
+    TaskState.COMPLETED,
+    TaskState.FAILED,
+    TaskState.CANCELLED,
+    TaskState.REJECTED,
+})
+# Rebuild the live dict after this many tasks have been archived...
+_COMPACT_EVERY = 1000
+# ...or once it holds less than this fraction of its peak size
+_LIVE_THRESHOLD = 0.3
+
+
+class _Entry:
+    """A task and its version history, stored together under one key."""
+    __slots__ = ("task", "history", "lock")
+
+    def __init__(self, task: Optional[Task] = None):
+        self.task = task
+        self.history: Optional[ModelHistory] = None
+        # Guards mutations of the history from concurrent A2A handlers.
+        # Reentrant so the holder of a batch() can keep adding versions.
+        self.lock = threading.RLock()
 
 
 class TaskManager:
     def __init__(self):
-        self._tasks: Dict[str, Task] = {}
-        self._histories: Dict[str, ModelHistory] = {}
+        # Tasks that are still in progress
+        self._tasks: Dict[str, _Entry] = {}
+        # Tasks in a terminal state, in the order they finished
+        self._archive: Dict[str, _Entry] = {}
+        # Guards moving entries between the two dicts
+        self._lock = threading.Lock()
+        self._archived_since_compact = 0
+        self._peak_live = 0
+
+    def _get_entry(self, task_id: str) -> Optional[_Entry]:
+        """Look up a task's entry, whether it is live or archived.
+
+        Moves between the two dicts always add before they remove, but a
+        restore can still slip in between the live miss and the archive
+        lookup, so the live dict is checked once more after an archive miss.
+        """
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            entry = self._archive.get(task_id)
+            if entry is None:
+                entry = self._tasks.get(task_id)
+        return entry
+
+    def _archive_task(self, task_id: str) -> None:
+        """Move a finished task out of the live dict, compacting it when sparse.
+
+        Python dicts never shrink on deletion, so the live dict is rebuilt
+        once enough entries have been removed from it.
+        """
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            if entry is None:
+                return
+            # Add before removing so readers checking live first still find it
+            self._archive[task_id] = entry
+            del self._tasks[task_id]
+
+            self._archived_since_compact += 1
+            if (self._archived_since_compact >= _COMPACT_EVERY
+                    or len(self._tasks) < self._peak_live * _LIVE_THRESHOLD):
+                self._tasks = {k: v for k, v in self._tasks.items()}
+                self._archived_since_compact = 0
+                self._peak_live = len(self._tasks)
+
+    def _restore_task(self, task_id: str) -> None:
+        """Move an archived task back to the live dict when it is reopened."""
+        if task_id not in self._archive:
+            return
+        with self._lock:
+            entry = self._archive.get(task_id)
+            if entry is None:
+                return
+            self._tasks[task_id] = entry
+            del self._archive[task_id]
+            self._peak_live = max(self._peak_live, len(self._tasks))
+
+    # Bookkeeping run after a task enters each state
+    _STATE_HANDLERS = {
+        **dict.fromkeys(_TERMINAL_STATES, _archive_task),
+        **dict.fromkeys(set(TaskState) - _TERMINAL_STATES, _restore_task),
+    }
 
     def create_task(self, context_id: Optional[str] = None) -> Task:
         """Create a new task.
@@ -25,19 +148,21 @@ class TaskManager:
         Returns:
             Task: The created task object.
         """
-        task_id = str(uuid.uuid4())
+        task_id = _new_uuid()
         if not context_id:
-            context_id = str(uuid.uuid4())
+            context_id = _new_uuid()
             
         task = Task(
             id=task_id,
             context_id=context_id,
             status=TaskStatus(
                 state=TaskState.SUBMITTED,
-                timestamp=datetime.utcnow()
+                timestamp=_utcnow()
             )
         )
-        self._tasks[task_id] = task
+        with self._lock:
+            self._tasks[task_id] = _Entry(task)
+            self._peak_live = max(self._peak_live, len(self._tasks))
         return task
 
     def get_task(self, task_id: str) -> Optional[Task]:
@@ -49,7 +174,20 @@ class TaskManager:
         Returns:
             Optional[Task]: The task object if found, else None.
         """
-        return self._tasks.get(task_id)
+        entry = self._get_entry(task_id)
+        return entry.task if entry else None
+
+    def archive_get(self, task_id: str) -> Optional[Task]:
+        """Retrieve a task only if it has been archived in a terminal state.
+
+        Args:
+            task_id (str): The task identifier.
+
+        Returns:
+            Optional[Task]: The archived task object if found, else None.
+        """
+        entry = self._archive.get(task_id)
+        return entry.task if entry else None
 
     def update_task_status(self, task_id: str, state: TaskState, message: Optional[Message] = None) -> None:
         """Update the status of a task.
@@ -62,11 +200,13 @@ class TaskManager:
         task = self.get_task(task_id)
         if task:
             task.status.state = state
-            task.status.timestamp = datetime.utcnow()
+            task.status.timestamp = _utcnow()
             if message:
                 task.status.message = message
                 task.history.append(message)
 
+            self._STATE_HANDLERS[state](self, task_id)
+
     # Version History Methods
 
     def create_history(self, task_id: str, original_prompt: str, name: Optional[str] = None) -> ModelHistory:
@@ -85,7 +225,11 @@ class TaskManager:
             name=name,
             original_prompt=original_prompt
         )
-        self._histories[task_id] = history
+        entry = self._get_entry(task_id)
+        if entry is None:
+            with self._lock:
+                entry = self._tasks.setdefault(task_id, _Entry())
+        entry.history = history
         return history
 
     def get_history(self, task_id: str) -> Optional[ModelHistory]:
@@ -97,7 +241,29 @@ class TaskManager:
         Returns:
             Optional[ModelHistory]: The history object if found, else None.
         """
-        return self._histories.get(task_id)
+        entry = self._get_entry(task_id)
+        return entry.history if entry else None
+
+    @contextmanager
+    def batch(self, task_id: str) -> Iterator[Optional[ModelHistory]]:
+        """Buffer the versions added to a task in this block and publish them on exit.
+
+        The task's lock is held for the whole block, including the final
+        flush, so other handlers adding versions wait for the batch to be
+        published instead of being buffered into it.
+
+        Args:
+            task_id (str): The task identifier.
+
+        Yields:
+            Optional[ModelHistory]: The task's history, or None if not found.
+        """
+        entry = self._get_entry(task_id)
+        if entry is None or entry.history is None:
+            yield None
+            return
+        with entry.lock, entry.history.batch() as history:
+            yield history
 
     def add_version(
         self,
@@ -113,6 +279,10 @@ class TaskManager:
     ) -> Optional[ModelVersion]:
         """Add a new version to the task's history.
 
+        This is a trusted internal entry point: the version is built with
+        ModelVersion.model_construct, skipping pydantic validation. Request
+        data is validated at the HTTP boundary before it reaches here.
+
         Args:
             task_id (str): The task identifier.
             prompt (str): The prompt used for this version.
@@ -127,26 +297,29 @@ class TaskManager:
         Returns:
             Optional[ModelVersion]: The created version, or None if history not found.
         """
-        history = self.get_history(task_id)
-        if not history:
+        entry = self._get_entry(task_id)
+        if entry is None or entry.history is None:
             return None
 
-        # Get parent ID from current version
-        parent_id = history.current_version_id if history.versions else None
-
-        version = ModelVersion(
-            id=history.next_version_id(),
-            parent_id=parent_id,
-            prompt=prompt,
-            version_type=version_type,
-            code=code,
-            stl_path=stl_path,
-            step_path=step_path,
-            png_path=png_path,
-            designer_feedback=designer_feedback,
-            approved=approved
-        )
-        history.add_version(version)
+        with entry.lock:
+            history = entry.history
+            new_id = history.allocate_next_version()
+            # Get parent ID from current version
+            parent_id = history.head_version_id()
+
+            version = ModelVersion.model_construct(
+                id=new_id,
+                parent_id=parent_id,
+                prompt=prompt,
+                version_type=version_type,
+                code=intern_text(code),
+                stl_path=stl_path,
+                step_path=step_path,
+                png_path=png_path,
+                designer_feedback=intern_text(designer_feedback),
+                approved=approved
+            )
+            history.add_version(version)
         return version
 
     def set_current_version(self, task_id: str, version_id: str) -> bool:
@@ -159,16 +332,12 @@ class TaskManager:
         Returns:
             bool: True if successful, False if history or version not found.
         """
-        history = self.get_history(task_id)
-        if not history:
+        entry = self._get_entry(task_id)
+        if entry is None or entry.history is None:
             return False
 
-        version = history.get_version(version_id)
-        if not version:
-            return False
-
-        history.current_version_id = version_id
-        return True
+        with entry.lock:
+            return entry.history.set_current_version(version_id)
 
     def update_version_approval(
         self,
@@ -188,15 +357,16 @@ class TaskManager:
         Returns:
             bool: True if successful, False if history or version not found.
         """
-        history = self.get_history(task_id)
-        if not history:
+        entry = self._get_entry(task_id)
+        if entry is None or entry.history is None:
             return False
 
-        version = history.get_version(version_id)
-        if not version:
-            return False
+        with entry.lock:
+            version = entry.history.get_version(version_id)
+            if version is None:
+                return False
 
-        version.approved = approved
-        if designer_feedback:
-            version.designer_feedback = designer_feedback
+            version.approved = approved
+            if designer_feedback:
+                version.designer_feedback = designer_feedback
         return True
@@ -4,20 +4,36 @@ This module defines Pydantic models for tracking model versions
 and version history in the CAD Builder application.
 """
 
-from datetime import datetime
-from typing import Optional, Literal, List
-from pydantic import Field
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional, Literal, List, Dict, Iterator
+from pydantic import Field, PrivateAttr, field_validator, model_validator
 
 from a2a.models import A2ABaseModel
 
 
+# Buffered versions are published after this many, even inside a batch
+FLUSH_THRESHOLD = 8
+
+
+def intern_text(value: Optional[str]) -> Optional[str]:
+    """Share one copy of identical code/feedback strings across versions."""
+    return sys.intern(value) if value else value
+
+
+def _version_number(version_id: str) -> int:
+    """Parse the N out of a "vN" version ID, or 0 for other IDs."""
+    return int(version_id[1:]) if version_id[1:].isdigit() else 0
+
+
 class ModelVersion(A2ABaseModel):
     """Represents a single version of a generated model.
 
     Attributes:
         id (str): Version identifier (e.g., "v1", "v2").
         parent_id (Optional[str]): ID of the parent version, None for initial.
-        timestamp (datetime): When this version was created.
+        timestamp (datetime): When this version was created, in UTC.
         prompt (str): The prompt used to create this version.
         version_type (str): Type of version (generation, auto-refine, regenerate, modification).
         code (str): The build123d Python code for this version.
@@ -26,10 +42,12 @@ class ModelVersion(A2ABaseModel):
         png_path (Optional[str]): Path to the rendered preview image.
         designer_feedback (Optional[str]): Feedback from the Designer agent.
         approved (bool): Whether this version was approved by the Designer.
+        ancestors_path (str): Slash-separated IDs from the root to the parent
+            (e.g., "v1/v2"), empty for an initial version.
     """
     id: str
     parent_id: Optional[str] = None
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     prompt: str
     version_type: Literal["generation", "auto-refine", "regenerate", "modification"]
     code: str = ""
@@ -38,6 +56,13 @@ class ModelVersion(A2ABaseModel):
     png_path: Optional[str] = None
     designer_feedback: Optional[str] = None
     approved: bool = False
+    ancestors_path: str = ""
+
+    @field_validator("code", "designer_feedback")
+    @classmethod
+    def _intern_text(cls, value: Optional[str]) -> Optional[str]:
+        """Share one copy of identical code/feedback across versions."""
+        return intern_text(value)
 
 
 class ModelHistory(A2ABaseModel):
@@ -56,12 +81,28 @@ class ModelHistory(A2ABaseModel):
     current_version_id: str = "v1"
     original_prompt: str = ""
 
+    # Maps version ID -> position in `versions` for O(1) lookups
+    _index: Dict[str, int] = PrivateAttr(default_factory=dict)
+    # Highest version number handed out so far
+    _counter: int = PrivateAttr(default=0)
+    # Versions added inside batch() that are not yet in `versions`
+    _pending_versions: List[ModelVersion] = PrivateAttr(default_factory=list)
+    _batch_depth: int = PrivateAttr(default=0)
+
+    @model_validator(mode="after")
+    def _rebuild_index(self) -> "ModelHistory":
+        """Rebuild the version index after construction or deserialization."""
+        self._index = {v.id: i for i, v in enumerate(self.versions)}
+        self._counter = max((_version_number(v.id) for v in self.versions), default=0)
+        return self
+
     def get_version(self, version_id: str) -> Optional[ModelVersion]:
         """Get a specific version by ID."""
-        for v in self.versions:
-            if v.id == version_id:
-                return v
-        return None
+        idx = self._index.get(version_id)
+        if idx is None:
+            return None
+        published = len(self.versions)
+        return self.versions[idx] if idx < published else self._pending_versions[idx - published]
 
     def get_current_version(self) -> Optional[ModelVersion]:
         """Get the currently displayed version."""
@@ -73,9 +114,96 @@ class ModelHistory(A2ABaseModel):
 
     def add_version(self, version: ModelVersion) -> None:
         """Add a new version to the history."""
-        self.versions.append(version)
-        self.current_version_id = version.id
+        parent = self.get_version(version.parent_id) if version.parent_id else None
+        if parent:
+            version.ancestors_path = (
+                f"{parent.ancestors_path}/{parent.id}" if parent.ancestors_path else parent.id
+            )
+        self._index[version.id] = len(self.versions) + len(self._pending_versions)
+        # Keep explicitly chosen IDs from being handed out again
+        self._counter = max(self._counter, _version_number(version.id))
+        if not self._batch_depth:
+            self.versions.append(version)
+            self.current_version_id = version.id
+            return
+
+        self._pending_versions.append(version)
+        if len(self._pending_versions) >= FLUSH_THRESHOLD:
+            self.flush()
+
+    def head_version_id(self) -> Optional[str]:
+        """Get the ID a new version should use as its parent, including buffered ones."""
+        if self._pending_versions:
+            return self._pending_versions[-1].id
+        return self.current_version_id if self.versions else None
+
+    def flush(self) -> None:
+        """Publish versions buffered by batch() and move HEAD to the last one.
+
+        Not atomic: callers sharing the history across threads must hold
+        the task's lock, as TaskManager.batch() does.
+        """
+        if not self._pending_versions:
+            return
+        self.versions.extend(self._pending_versions)
+        self.current_version_id = self._pending_versions[-1].id
+        self._pending_versions = []
+
+    def set_current_version(self, version_id: str) -> bool:
+        """Move HEAD to an existing version.
+
+        Buffered versions are published first, so the next flush cannot
+        move HEAD away from the chosen version.
+
+        Returns:
+            bool: True if successful, False if the version is not found.
+        """
+        if self.get_version(version_id) is None:
+            return False
+        self.flush()
+        self.current_version_id = version_id
+        return True
+
+    @contextmanager
+    def batch(self) -> Iterator["ModelHistory"]:
+        """Buffer versions added in this block and publish them together on exit.
+
+        Buffered versions can be looked up with get_version but do not appear
+        in `versions` (or move HEAD) until the batch ends or FLUSH_THRESHOLD
+        of them have accumulated. Batches may be nested.
+
+        The batch depth is shared by everyone using this history, so
+        concurrent handlers should go through TaskManager.batch(), which
+        holds the task's lock for the whole block.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+
+    def ancestors(self, version_id: str) -> List[str]:
+        """Get the IDs of a version's ancestors, from the root to its parent."""
+        version = self.get_version(version_id)
+        if not version or not version.ancestors_path:
+            return []
+        return version.ancestors_path.split("/")
+
+    def allocate_next_version(self) -> str:
+        """Reserve and return the next version ID (v1, v2, etc.).
+
+        IDs come from a monotonic counter rather than the number of versions,
+        so they stay unique even if versions are later removed.
+        """
+        self._counter += 1
+        return f"v{self._counter}"
 
     def next_version_id(self) -> str:
-        """Generate the next version ID (v1, v2, etc.)."""
-        return f"v{len(self.versions) + 1}"
+        """Peek at the version ID the next allocation will return.
+
+        Adding a version with this ID advances the counter, so calling
+        this once per add_version() still yields sequential IDs.
+        """
+        return f"v{self._counter + 1}"
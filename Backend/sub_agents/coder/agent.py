@@ -10,7 +10,7 @@ from typing import Optional
 from google.adk.agents import LlmAgent
 from tools.rag_tool import RAGTool
 from tools.cad_tools import create_cad_model
-from .prompt import SYSTEM_PROMPT, MODIFICATION_PROMPT, SECTION_MODIFICATION_PROMPT
+from .prompt import SYSTEM_PROMPT, build_modification_prompt, build_section_modification_prompt
 from .section_parser import (
     parse_sections,
     get_section,
@@ -72,7 +72,7 @@ def get_modifier_agent(
         rag_tool = RAGTool()
 
     # Format the modification prompt with the provided context
-    formatted_instruction = MODIFICATION_PROMPT.format(
+    formatted_instruction = build_modification_prompt(
         existing_code=existing_code,
         modification_prompt=modification_prompt,
         rag_context=rag_context if rag_context else "No additional context available."
@@ -115,7 +115,7 @@ def get_section_modifier_agent(
     if rag_tool is None:
         rag_tool = RAGTool()
 
-    formatted_instruction = SECTION_MODIFICATION_PROMPT.format(
+    formatted_instruction = build_section_modification_prompt(
         section_name=section_name,
         section_code=section_code,
         modification_prompt=modification_prompt,
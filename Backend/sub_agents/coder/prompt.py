@@ -4,6 +4,7 @@ This module contains the system instructions for the Coder Agent,
 defining its role, capabilities, and rules for generating build123d code.
 """
 
+import string
 import textwrap
 
 SYSTEM_PROMPT = textwrap.dedent("""
@@ -192,3 +193,53 @@ Rules:
 - Do NOT include the section marker comment (# === {section_name} ===) - the system adds it.
 - Do NOT include code from other sections.
 """)
+
+
+def _split_template(template: str) -> tuple[tuple[str, str | None], ...]:
+    """Split a str.format template into (literal, field_name) segments once."""
+    return tuple(
+        (literal, field_name)
+        for literal, field_name, _, _ in string.Formatter().parse(template)
+    )
+
+
+def _fill_template(segments: tuple[tuple[str, str | None], ...], values: dict[str, str]) -> str:
+    """Join pre-split template segments with their values."""
+    return "".join(
+        literal + values[field_name] if field_name is not None else literal
+        for literal, field_name in segments
+    )
+
+
+_MODIFICATION_SEGMENTS = _split_template(MODIFICATION_PROMPT)
+_SECTION_MODIFICATION_SEGMENTS = _split_template(SECTION_MODIFICATION_PROMPT)
+
+
+def build_modification_prompt(existing_code: str, modification_prompt: str, rag_context: str) -> str:
+    """Fill MODIFICATION_PROMPT without re-parsing the template on every call.
+
+    Equivalent to MODIFICATION_PROMPT.format(...).
+    """
+    return _fill_template(_MODIFICATION_SEGMENTS, {
+        "existing_code": existing_code,
+        "modification_prompt": modification_prompt,
+        "rag_context": rag_context,
+    })
+
+
+def build_section_modification_prompt(
+    section_name: str,
+    section_code: str,
+    modification_prompt: str,
+    rag_context: str
+) -> str:
+    """Fill SECTION_MODIFICATION_PROMPT without re-parsing the template on every call.
+
+    Equivalent to SECTION_MODIFICATION_PROMPT.format(...).
+    """
+    return _fill_template(_SECTION_MODIFICATION_SEGMENTS, {
+        "section_name": section_name,
+        "section_code": section_code,
+        "modification_prompt": modification_prompt,
+        "rag_context": rag_context,
+    })
@@ -4,63 +4,169 @@ This module provides utilities to parse, extract, and replace named sections
 in build123d code, enabling targeted modifications without affecting other parts.
 """
 
+import functools
 import re
-from typing import Optional
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 
 # Pattern to match section markers: # === SECTION_NAME ===
-SECTION_PATTERN = re.compile(r'^(\s*)# === ([A-Z_]+) ===$', re.MULTILINE)
+# The second alternative matches the `result =` line that ends the last section.
+SECTION_PATTERN = re.compile(r'^(\s*)# === ([A-Z_]+) ===$|^\s*result\s*=', re.MULTILINE)
 
+# Characters trimmed from the end of a section
+_TRAILING_WHITESPACE = '\n\r \t'
+# Leading whitespace skipped before a section's content
+_LEADING_WHITESPACE = re.compile(r'\s*')
+# Valid section names, checked only on lines that look like markers
+_SECTION_NAME = re.compile(r'[A-Z_]+')
 
-def parse_sections(code: str) -> dict[str, dict]:
+
+# Map common words to section names, in priority order
+SECTION_KEYWORDS = {
+    "head": "HEAD",
+    "body": "BODY", "torso": "BODY", "chest": "BODY",
+    "leg": "LEGS", "legs": "LEGS", "feet": "LEGS", "foot": "LEGS",
+    "arm": "ARMS", "arms": "ARMS", "hand": "ARMS", "hands": "ARMS",
+    "tail": "TAIL",
+    "antenna": "ANTENNA", "antennae": "ANTENNA",
+    "wing": "WINGS", "wings": "WINGS",
+    "wheel": "WHEELS", "wheels": "WHEELS", "tire": "WHEELS",
+    "eye": "EYES", "eyes": "EYES",
+    "ear": "EARS", "ears": "EARS",
+    "neck": "NECK",
+    "base": "BASE", "bottom": "BASE",
+    "top": "TOP", "roof": "TOP",
+}
+
+# Priority rank of each section: the order its first keyword appears above
+_SECTION_RANK = {
+    section: rank for rank, section in enumerate(dict.fromkeys(SECTION_KEYWORDS.values()))
+}
+
+# Matches any keyword at every position (the lookahead lets matches overlap)
+_KEYWORD_PATTERN = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(SECTION_KEYWORDS, key=len, reverse=True))) + "))"
+)
+
+
+def _section_info(code: str, match: re.Match, end: int) -> Mapping:
+    """Build the info dict for the section opened by `match` and ending at `end`."""
+    start = match.end() + 1  # Start after the newline
+    
+    # Trim trailing whitespace/newlines
+    if end > start:
+        end = start + len(code[start:end].rstrip(_TRAILING_WHITESPACE))
+    
+    # Only record where the content begins; it is sliced out on demand
+    content_start = _LEADING_WHITESPACE.match(code, min(start, end), end).end()
+    
+    return MappingProxyType({
+        "start": match.start(),
+        "end": end,
+        "content_start": content_start,
+        "indent": match.group(1),
+        "marker_end": match.end()
+    })
+
+
+@functools.lru_cache(maxsize=128)
+def parse_sections(code: str) -> Mapping[str, Mapping]:
     """Parse code into named sections.
     
+    Results are cached per code string, so listing, extracting and replacing
+    sections of the same code only parses it once. The returned mappings are
+    read-only because they are shared between callers. Section content is
+    not copied out of `code`; use `get_section` or `get_section_span`.
+    
     Args:
         code: The complete build123d code with section markers.
         
     Returns:
-        Dict mapping section names to {start, end, content, indent} info.
+        Read-only mapping of section names to {start, end, content_start, indent} info.
         
     Example:
         >>> sections = parse_sections(code)
         >>> sections["HEAD"]
-        {"start": 45, "end": 120, "content": "Box(30, 25, 25)", "indent": "    "}
+        {"start": 45, "end": 120, "content_start": 105, "indent": "    ", "marker_end": 100}
     """
     sections = {}
-    matches = list(SECTION_PATTERN.finditer(code))
+    current = None  # Marker of the section being scanned
+    result_start = None  # First `result =` seen after that marker
+    
+    for match in SECTION_PATTERN.finditer(code):
+        if match.group(2) is None:
+            # Only the last section ends at `result =`, so just remember it.
+            # The section ends at the first newline inside it that precedes it.
+            if current is not None and result_start is None:
+                newline = code.find('\n', max(match.start() - 1, current.end() + 1), match.end())
+                if newline != -1:
+                    result_start = newline
+            continue
+        
+        # End the previous section where this marker line starts
+        if current is not None:
+            sections[current.group(2)] = _section_info(code, current, match.start())
+        current = match
+        result_start = None
+    
+    if current is not None:
+        # Last section - ends before 'result =' or at end of code
+        end = result_start if result_start is not None else len(code)
+        sections[current.group(2)] = _section_info(code, current, end)
+    
+    return MappingProxyType(sections)
+
+
+def parse_sections_from_lines(lines: list[str]) -> dict[str, dict]:
+    """Parse code that is already split into lines into named sections.
+    
+    Fast path for callers holding a list of lines (as from str.splitlines()):
+    markers are found with a prefix check per line instead of a regex scan
+    of the joined code. Sections end at the next marker, or for the last one
+    at the `result =` line, with trailing blank lines dropped.
     
-    for i, match in enumerate(matches):
-        section_name = match.group(2)
-        indent = match.group(1)
-        start = match.end() + 1  # Start after the newline
+    Args:
+        lines: The build123d code as lines without line endings.
+        
+    Returns:
+        Dict mapping section names to {start, end, content, indent} info,
+        where start is the marker's line index and end is exclusive.
         
-        # End is either the next section or end of code
-        if i + 1 < len(matches):
-            # Find where the next section marker line starts
-            end = matches[i + 1].start()
-            # Trim trailing whitespace/newlines
-            while end > start and code[end - 1] in '\n\r \t':
-                end -= 1
+    Example:
+        >>> sections = parse_sections_from_lines(code.splitlines())
+        >>> sections["HEAD"]
+        {"start": 4, "end": 6, "content": "Box(30, 25, 25)", "indent": "    "}
+    """
+    markers = []
+    result_line = None  # First `result =` line after the last marker
+    
+    for i, line in enumerate(lines):
+        stripped = line.lstrip()
+        if (stripped.startswith("# === ") and stripped.endswith(" ===")
+                and _SECTION_NAME.fullmatch(stripped, 6, len(stripped) - 4)):
+            markers.append((i, stripped[6:-4], line[:len(line) - len(stripped)]))
+            result_line = None
+        elif (result_line is None and markers and i > markers[-1][0] + 1
+                and stripped.startswith("result") and stripped[6:].lstrip().startswith("=")):
+            result_line = i
+    
+    sections = {}
+    for n, (start, name, indent) in enumerate(markers):
+        if n + 1 < len(markers):
+            end = markers[n + 1][0]
         else:
-            # Last section - find where code ends (before result = or end of BuildPart)
-            # Look for 'result =' or end of code
-            result_match = re.search(r'\n\s*result\s*=', code[start:])
-            if result_match:
-                end = start + result_match.start()
-            else:
-                end = len(code)
-            # Trim trailing whitespace
-            while end > start and code[end - 1] in '\n\r \t':
-                end -= 1
+            end = result_line if result_line is not None else len(lines)
         
-        content = code[start:end].strip()
+        # Trim trailing blank lines
+        while end > start + 1 and not lines[end - 1].strip():
+            end -= 1
         
-        sections[section_name] = {
-            "start": match.start(),
+        sections[name] = {
+            "start": start,
             "end": end,
-            "content": content,
-            "indent": indent,
-            "marker_end": match.end()
+            "content": "\n".join(lines[start + 1:end]).strip(),
+            "indent": indent
         }
     
     return sections
@@ -76,9 +182,23 @@ def get_section(code: str, section_name: str) -> Optional[str]:
     Returns:
         The section's code content, or None if not found.
     """
+    span = get_section_span(code, section_name)
+    return code[span[0]:span[1]].strip() if span else None
+
+
+def get_section_span(code: str, section_name: str) -> Optional[tuple[int, int]]:
+    """Locate a specific section's content without copying it.
+    
+    Args:
+        code: The complete build123d code.
+        section_name: The section to locate (e.g., "LEGS", "HEAD").
+        
+    Returns:
+        (start, end) offsets of the section's content in `code`, or None if not found.
+    """
     sections = parse_sections(code)
     section = sections.get(section_name.upper())
-    return section["content"] if section else None
+    return (section["content_start"], section["end"]) if section else None
 
 
 def replace_section(code: str, section_name: str, new_content: str) -> str:
@@ -106,9 +226,11 @@ def replace_section(code: str, section_name: str, new_content: str) -> str:
     marker_end = section["marker_end"]
     section_end = section["end"]
     
-    # Indent the new content to match
+    # Indent the new content to match, leaving blank lines untouched.
+    # Split on "\n" only so stray \r/\v/\f in the content are not line breaks.
+    prefix = indent + "    "
     indented_content = "\n".join(
-        f"{indent}    {line}" if line.strip() else line
+        prefix + line if line.strip() else line
         for line in new_content.strip().split("\n")
     )
     
@@ -143,26 +265,11 @@ def identify_target_section(modification_prompt: str, available_sections: list[s
     """
     prompt_lower = modification_prompt.lower()
     
-    # Map common words to section names
-    keyword_map = {
-        "head": "HEAD",
-        "body": "BODY", "torso": "BODY", "chest": "BODY",
-        "leg": "LEGS", "legs": "LEGS", "feet": "LEGS", "foot": "LEGS",
-        "arm": "ARMS", "arms": "ARMS", "hand": "ARMS", "hands": "ARMS",
-        "tail": "TAIL",
-        "antenna": "ANTENNA", "antennae": "ANTENNA",
-        "wing": "WINGS", "wings": "WINGS",
-        "wheel": "WHEELS", "wheels": "WHEELS", "tire": "WHEELS",
-        "eye": "EYES", "eyes": "EYES",
-        "ear": "EARS", "ears": "EARS",
-        "neck": "NECK",
-        "base": "BASE", "bottom": "BASE",
-        "top": "TOP", "roof": "TOP",
-    }
-    
-    for keyword, section in keyword_map.items():
-        if keyword in prompt_lower and section in available_sections:
-            return section
+    # Find every keyword in one scan, then pick the highest priority section
+    matched = {SECTION_KEYWORDS[m.group(1)] for m in _KEYWORD_PATTERN.finditer(prompt_lower)}
+    candidates = [section for section in matched if section in available_sections]
+    if candidates:
+        return min(candidates, key=_SECTION_RANK.__getitem__)
     
     # Try direct section name match
     for section in available_sections:
@@ -11,7 +11,13 @@ from sub_agents.coder.agent import (
     get_modifier_agent,
     CodeModifier
 )
-from sub_agents.coder.prompt import SYSTEM_PROMPT, MODIFICATION_PROMPT
+from sub_agents.coder.prompt import (
+    SYSTEM_PROMPT,
+    MODIFICATION_PROMPT,
+    SECTION_MODIFICATION_PROMPT,
+    build_modification_prompt,
+    build_section_modification_prompt
+)
 
 
 class TestGetCoderAgent(unittest.TestCase):
@@ -254,6 +260,28 @@ class TestModificationPrompt(unittest.TestCase):
         self.assertIn("test prompt", formatted)
         self.assertIn("test context", formatted)
 
+    def test_build_modification_prompt_matches_format(self):
+        """Test that the pre-split builder matches str.format output."""
+        values = dict(
+            existing_code="result = Box({w}, 1, 1)",
+            modification_prompt="make it taller",
+            rag_context="test context"
+        )
+        self.assertEqual(build_modification_prompt(**values), MODIFICATION_PROMPT.format(**values))
+
+    def test_build_section_modification_prompt_matches_format(self):
+        """Test that the section builder fills every placeholder like str.format."""
+        values = dict(
+            section_name="LEGS",
+            section_code="Cylinder(radius=4, height=10)",
+            modification_prompt="longer legs",
+            rag_context="test context"
+        )
+        self.assertEqual(
+            build_section_modification_prompt(**values),
+            SECTION_MODIFICATION_PROMPT.format(**values)
+        )
+
 
 class TestInventoryValidation(unittest.TestCase):
     """Tests for inventory compatibility validation."""
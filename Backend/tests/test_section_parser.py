@@ -0,0 +1,131 @@
+"""Tests for the Coder Agent section parser.
+
+This module tests parsing, extracting and replacing named sections
+in build123d code.
+"""
+
+import unittest
+from sub_agents.coder.section_parser import (
+    parse_sections,
+    parse_sections_from_lines,
+    get_section,
+    get_section_span,
+    replace_section,
+    list_sections,
+    identify_target_section
+)
+
+
+SECTIONED_CODE = """from build123d import *
+
+with BuildPart() as part:
+    # === BODY ===
+    Box(30, 20, 20)
+
+    # === HEAD ===
+    with Locations((0, 0, 20)):
+        Sphere(8)
+
+result = part.part
+"""
+
+
+class TestParseSections(unittest.TestCase):
+    """Tests for parsing and extracting sections."""
+
+    def test_list_sections(self):
+        """Test that sections are listed in code order."""
+        self.assertEqual(list_sections(SECTIONED_CODE), ["BODY", "HEAD"])
+
+    def test_get_section(self):
+        """Test extracting a section's stripped content."""
+        self.assertEqual(get_section(SECTIONED_CODE, "body"), "Box(30, 20, 20)")
+        self.assertEqual(
+            get_section(SECTIONED_CODE, "HEAD"),
+            "with Locations((0, 0, 20)):\n        Sphere(8)"
+        )
+        self.assertIsNone(get_section(SECTIONED_CODE, "LEGS"))
+
+    def test_get_section_span(self):
+        """Test that the span covers exactly the section's content."""
+        start, end = get_section_span(SECTIONED_CODE, "BODY")
+        self.assertEqual(SECTIONED_CODE[start:end], "Box(30, 20, 20)")
+        self.assertIsNone(get_section_span(SECTIONED_CODE, "LEGS"))
+
+    def test_last_section_stops_before_result(self):
+        """Test that the last section ends before the result assignment."""
+        head = parse_sections(SECTIONED_CODE)["HEAD"]
+        self.assertTrue(SECTIONED_CODE[head["end"]:].lstrip().startswith("result ="))
+
+    def test_parse_is_cached_and_read_only(self):
+        """Test that repeated parses share one read-only result."""
+        sections = parse_sections(SECTIONED_CODE)
+        self.assertIs(parse_sections(SECTIONED_CODE), sections)
+        with self.assertRaises(TypeError):
+            sections["BODY"]["end"] = 0
+
+    def test_parse_sections_from_lines(self):
+        """Test that the line-based parser finds the same sections."""
+        lines = SECTIONED_CODE.splitlines()
+        sections = parse_sections_from_lines(lines)
+
+        self.assertEqual(list(sections), ["BODY", "HEAD"])
+        for name, section in sections.items():
+            self.assertEqual(section["content"], get_section(SECTIONED_CODE, name))
+            self.assertEqual(section["indent"], "    ")
+        self.assertEqual((sections["BODY"]["start"], sections["BODY"]["end"]), (3, 5))
+        self.assertTrue(lines[sections["HEAD"]["end"] + 1].startswith("result ="))
+
+    def test_no_sections(self):
+        """Test parsing code without section markers."""
+        self.assertEqual(parse_sections("result = Box(1, 1, 1)"), {})
+
+
+class TestReplaceSection(unittest.TestCase):
+    """Tests for replacing section content."""
+
+    def test_replace_section_indents_content(self):
+        """Test that new content is indented one level past the marker."""
+        new_code = replace_section(SECTIONED_CODE, "body", "Box(40, 20, 20)\n\nCylinder(2, 5)")
+
+        self.assertIn("    # === BODY ===\n        Box(40, 20, 20)\n\n        Cylinder(2, 5)\n", new_code)
+        self.assertEqual(get_section(new_code, "HEAD"), get_section(SECTIONED_CODE, "HEAD"))
+        self.assertTrue(new_code.endswith("result = part.part\n"))
+
+    def test_replace_section_only_splits_on_newlines(self):
+        """Test that form feeds and carriage returns are not treated as line breaks."""
+        new_code = replace_section(SECTIONED_CODE, "BODY", "a\x0cb\rc")
+        self.assertIn("    # === BODY ===\n        a\x0cb\rc\n", new_code)
+
+    def test_replace_missing_section(self):
+        """Test that replacing an unknown section raises ValueError."""
+        with self.assertRaises(ValueError):
+            replace_section(SECTIONED_CODE, "LEGS", "Box(1, 1, 1)")
+
+
+class TestIdentifyTargetSection(unittest.TestCase):
+    """Tests for mapping modification prompts to sections."""
+
+    def test_keyword_match(self):
+        """Test that keywords map to their section."""
+        sections = ["BODY", "HEAD", "LEGS"]
+        self.assertEqual(identify_target_section("Make the torso wider", sections), "BODY")
+        self.assertEqual(identify_target_section("longer feet please", sections), "LEGS")
+
+    def test_keyword_priority(self):
+        """Test that the higher priority section wins when several match."""
+        sections = ["BODY", "HEAD", "WINGS"]
+        self.assertEqual(identify_target_section("wider body, bigger head", sections), "HEAD")
+        self.assertEqual(identify_target_section("wings on the body", sections), "BODY")
+
+    def test_keyword_for_missing_section(self):
+        """Test that keywords for absent sections are ignored."""
+        self.assertIsNone(identify_target_section("add wings", ["BODY", "HEAD"]))
+
+    def test_direct_section_name_match(self):
+        """Test falling back to the section name itself."""
+        self.assertEqual(identify_target_section("bigger turret", ["BODY", "TURRET"]), "TURRET")
+
+
+if __name__ == '__main__':
+    unittest.main()
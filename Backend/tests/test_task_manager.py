@@ -0,0 +1,164 @@
+"""Tests for the A2A TaskManager.
+
+This module tests task creation, status updates and the version
+history helpers exposed by TaskManager.
+"""
+
+import threading
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+from a2a.task_manager import TaskManager
+from a2a.models import TaskState, Message, Role, Part
+
+
+class TestTaskManager(unittest.TestCase):
+    """Tests for the TaskManager class."""
+
+    def setUp(self):
+        """Set up a manager with one task and an empty history."""
+        self.manager = TaskManager()
+        self.task = self.manager.create_task(context_id="ctx_1")
+        self.manager.create_history(self.task.id, original_prompt="a cube")
+
+    def test_create_and_get_task(self):
+        """Test that created tasks can be retrieved."""
+        self.assertIs(self.manager.get_task(self.task.id), self.task)
+        self.assertEqual(self.task.status.state, TaskState.SUBMITTED)
+        self.assertIsNone(self.manager.get_task("missing"))
+
+    def test_task_ids_are_unique_uuid4(self):
+        """Test that generated task and context IDs are distinct UUID4s."""
+        tasks = [self.manager.create_task() for _ in range(200)]
+        ids = {t.id for t in tasks} | {t.context_id for t in tasks}
+
+        self.assertEqual(len(ids), 400)
+        self.assertTrue(all(uuid.UUID(i).version == 4 for i in ids))
+
+    def test_update_task_status(self):
+        """Test that status updates record state and message."""
+        message = Message(role=Role.AGENT, parts=[Part(text="done")])
+        self.manager.update_task_status(self.task.id, TaskState.COMPLETED, message)
+
+        task = self.manager.get_task(self.task.id)
+        self.assertEqual(task.status.state, TaskState.COMPLETED)
+        self.assertIs(task.status.message, message)
+        self.assertEqual(task.history, [message])
+
+    def test_status_timestamps_are_utc(self):
+        """Test that status timestamps are timezone-aware and current."""
+        self.manager.update_task_status(self.task.id, TaskState.WORKING)
+
+        timestamp = self.manager.get_task(self.task.id).status.timestamp
+        self.assertEqual(timestamp.tzinfo, timezone.utc)
+        self.assertLess(abs(datetime.now(timezone.utc) - timestamp), timedelta(seconds=1))
+
+    def test_terminal_task_is_archived_but_retrievable(self):
+        """Test that finished tasks move to the archive and stay readable."""
+        self.manager.update_task_status(self.task.id, TaskState.COMPLETED)
+
+        self.assertNotIn(self.task.id, self.manager._tasks)
+        self.assertIs(self.manager.archive_get(self.task.id), self.task)
+        self.assertIs(self.manager.get_task(self.task.id), self.task)
+        self.assertIsNotNone(self.manager.get_history(self.task.id))
+
+    def test_reopened_task_leaves_archive(self):
+        """Test that a task set back to WORKING becomes live again."""
+        self.manager.update_task_status(self.task.id, TaskState.FAILED)
+        self.manager.update_task_status(self.task.id, TaskState.WORKING)
+
+        self.assertIn(self.task.id, self.manager._tasks)
+        self.assertIsNone(self.manager.archive_get(self.task.id))
+        self.assertEqual(self.manager.get_task(self.task.id).status.state, TaskState.WORKING)
+
+    def test_live_dict_compacts_after_archiving(self):
+        """Test that many finished tasks are archived and the live dict rebuilt."""
+        tasks = [self.manager.create_task() for _ in range(50)]
+        live = self.manager._tasks
+        for task in tasks:
+            self.manager.update_task_status(task.id, TaskState.COMPLETED)
+
+        self.assertIsNot(self.manager._tasks, live)
+        self.assertEqual(list(self.manager._tasks), [self.task.id])
+        self.assertTrue(all(self.manager.get_task(t.id) is t for t in tasks))
+
+    def test_add_version_links_parent(self):
+        """Test that each new version points at the previous HEAD."""
+        v1 = self.manager.add_version(self.task.id, "a cube", "generation")
+        v2 = self.manager.add_version(self.task.id, "a cube", "auto-refine")
+
+        self.assertEqual((v1.id, v1.parent_id), ("v1", None))
+        self.assertEqual((v2.id, v2.parent_id), ("v2", "v1"))
+        self.assertEqual(self.manager.get_history(self.task.id).current_version_id, "v2")
+
+    def test_add_version_without_history(self):
+        """Test that adding a version to an unknown task returns None."""
+        self.assertIsNone(self.manager.add_version("missing", "a cube", "generation"))
+
+    def test_set_current_version(self):
+        """Test switching HEAD to an existing version only."""
+        self.manager.add_version(self.task.id, "a cube", "generation")
+        self.manager.add_version(self.task.id, "a cube", "auto-refine")
+
+        self.assertTrue(self.manager.set_current_version(self.task.id, "v1"))
+        self.assertEqual(self.manager.get_history(self.task.id).current_version_id, "v1")
+        self.assertFalse(self.manager.set_current_version(self.task.id, "v9"))
+        self.assertFalse(self.manager.set_current_version("missing", "v1"))
+
+    def test_update_version_approval(self):
+        """Test updating approval and feedback of a version."""
+        self.manager.add_version(self.task.id, "a cube", "generation")
+
+        self.assertTrue(self.manager.update_version_approval(self.task.id, "v1", True, "Looks good"))
+        version = self.manager.get_history(self.task.id).get_version("v1")
+        self.assertTrue(version.approved)
+        self.assertEqual(version.designer_feedback, "Looks good")
+        self.assertFalse(self.manager.update_version_approval(self.task.id, "v9", True))
+
+    def test_versions_inside_batch(self):
+        """Test approving and selecting versions that are still buffered in a batch."""
+        history = self.manager.get_history(self.task.id)
+        self.manager.add_version(self.task.id, "a cube", "generation")
+        with self.manager.batch(self.task.id):
+            self.manager.add_version(self.task.id, "a cube", "auto-refine")
+            self.manager.add_version(self.task.id, "a cube", "auto-refine")
+
+            self.assertTrue(self.manager.update_version_approval(self.task.id, "v2", True))
+            self.assertTrue(history.get_version("v2").approved)
+            self.assertTrue(self.manager.set_current_version(self.task.id, "v2"))
+
+        self.assertEqual([v.id for v in history.versions], ["v1", "v2", "v3"])
+        self.assertEqual(history.current_version_id, "v2")
+
+    def test_add_version_waits_for_batch_flush(self):
+        """Test that a version added from another thread mid-flush keeps the index intact."""
+        history = self.manager.get_history(self.task.id)
+        adder = threading.Thread(
+            target=self.manager.add_version, args=(self.task.id, "a cube", "regenerate")
+        )
+        blocked = []
+
+        class FlushHook(list):
+            def extend(self, items):
+                adder.start()
+                adder.join(timeout=0.2)
+                blocked.append(adder.is_alive())
+                super().extend(items)
+
+        history.versions = FlushHook(history.versions)
+        with self.manager.batch(self.task.id):
+            self.manager.add_version(self.task.id, "a cube", "generation")
+            self.manager.add_version(self.task.id, "a cube", "auto-refine")
+        adder.join()
+
+        self.assertEqual(blocked, [True])
+        self.assertEqual([v.id for v in history.versions], ["v1", "v2", "v3"])
+        self.assertTrue(all(history.get_version(v.id) is v for v in history.versions))
+        self.assertEqual(history.current_version_id, "v3")
+
+        with self.manager.batch("missing") as missing:
+            self.assertIsNone(missing)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""Tests for the version history models.
+
+This module tests ModelHistory version lookup, ID allocation and
+JSON round-trips.
+"""
+
+import unittest
+from datetime import timezone
+from a2a.version_history import ModelVersion, ModelHistory, FLUSH_THRESHOLD
+
+
+class TestModelHistory(unittest.TestCase):
+    """Tests for the ModelHistory class."""
+
+    def setUp(self):
+        """Set up a history with three versions."""
+        self.history = ModelHistory(project_id="task_1", original_prompt="a cube")
+        for _ in range(3):
+            self.history.add_version(ModelVersion(
+                id=self.history.allocate_next_version(),
+                prompt="a cube",
+                version_type="generation"
+            ))
+
+    def test_next_version_id_increments(self):
+        """Test that version IDs are allocated sequentially."""
+        self.assertEqual([v.id for v in self.history.versions], ["v1", "v2", "v3"])
+        self.assertEqual(self.history.next_version_id(), "v4")
+
+    def test_allocated_ids_are_not_reused(self):
+        """Test that IDs keep increasing after versions are removed."""
+        self.history.versions.pop()
+        self.assertEqual(self.history.allocate_next_version(), "v4")
+
+    def test_explicit_ids_advance_allocation(self):
+        """Test that explicitly chosen IDs are never allocated again."""
+        self.history.add_version(ModelVersion(id="v7", prompt="p", version_type="generation"))
+        self.assertEqual(self.history.allocate_next_version(), "v8")
+
+        history = ModelHistory(project_id="task_2")
+        for _ in range(2):
+            history.add_version(ModelVersion(
+                id=history.next_version_id(), prompt="p", version_type="generation"
+            ))
+        self.assertEqual([v.id for v in history.versions], ["v1", "v2"])
+
+    def test_get_version(self):
+        """Test looking up versions by ID."""
+        self.assertIs(self.history.get_version("v2"), self.history.versions[1])
+        self.assertIsNone(self.history.get_version("v99"))
+
+    def test_current_version_follows_add(self):
+        """Test that adding a version moves HEAD to it."""
+        self.assertEqual(self.history.current_version_id, "v3")
+        self.assertIs(self.history.get_current_version(), self.history.versions[2])
+
+    def test_ancestors(self):
+        """Test that ancestor IDs follow parent links back to the root."""
+        history = ModelHistory(project_id="task_2")
+        for version_id, parent_id in [("v1", None), ("v2", "v1"), ("v3", "v2"), ("v4", "v1")]:
+            history.add_version(ModelVersion(
+                id=version_id, parent_id=parent_id, prompt="p", version_type="generation"
+            ))
+
+        self.assertEqual(history.ancestors("v1"), [])
+        self.assertEqual(history.ancestors("v3"), ["v1", "v2"])
+        self.assertEqual(history.ancestors("v4"), ["v1"])
+        self.assertEqual(history.ancestors("v99"), [])
+
+    def test_batch_publishes_versions_on_exit(self):
+        """Test that versions added in a batch appear together when it ends."""
+        with self.history.batch():
+            for parent_id in ["v3", "v4"]:
+                self.assertEqual(self.history.head_version_id(), parent_id)
+                self.history.add_version(ModelVersion(
+                    id=self.history.allocate_next_version(),
+                    parent_id=parent_id,
+                    prompt="a cube",
+                    version_type="auto-refine"
+                ))
+            self.assertEqual(len(self.history.versions), 3)
+            self.assertEqual(self.history.current_version_id, "v3")
+            self.assertEqual(self.history.ancestors("v5"), ["v3", "v4"])
+
+        self.assertEqual([v.id for v in self.history.versions[3:]], ["v4", "v5"])
+        self.assertEqual(self.history.current_version_id, "v5")
+        self.assertIs(self.history.get_version("v5"), self.history.versions[4])
+
+    def test_batch_flushes_at_threshold(self):
+        """Test that a long batch still publishes every FLUSH_THRESHOLD versions."""
+        with self.history.batch():
+            for _ in range(FLUSH_THRESHOLD):
+                self.history.add_version(ModelVersion(
+                    id=self.history.allocate_next_version(),
+                    prompt="a cube",
+                    version_type="auto-refine"
+                ))
+            self.assertEqual(len(self.history.versions), 3 + FLUSH_THRESHOLD)
+
+    def test_artifact_paths(self):
+        """Test that file paths can be set later and serialize under camelCase keys."""
+        version = ModelVersion(id="v1", prompt="p", version_type="generation", stl_path="outputs/v1.stl")
+        version.png_path = "outputs/v1.png"
+
+        data = version.model_dump(by_alias=True)
+        self.assertEqual(
+            (data["stlPath"], data["stepPath"], data["pngPath"]),
+            ("outputs/v1.stl", None, "outputs/v1.png")
+        )
+        self.assertEqual(ModelVersion.model_validate(data).png_path, "outputs/v1.png")
+
+    def test_timestamp_is_utc(self):
+        """Test that version timestamps are timezone-aware UTC like task statuses."""
+        version = self.history.versions[0]
+        self.assertEqual(version.timestamp.tzinfo, timezone.utc)
+        self.assertTrue(version.model_dump(mode="json")["timestamp"].endswith("Z"))
+
+    def test_identical_code_is_shared(self):
+        """Test that versions with equal code share one string object."""
+        code = "from build123d import *\nresult = Box(1, 1, 1)\n"
+        a = ModelVersion(id="v1", prompt="p", version_type="generation", code="".join(code))
+        b = ModelVersion(id="v2", prompt="p", version_type="auto-refine", code=code[:10] + code[10:])
+        self.assertIs(a.code, b.code)
+
+    def test_json_round_trip_preserves_index(self):
+        """Test that a deserialized history can still look up versions."""
+        restored = ModelHistory.model_validate_json(self.history.model_dump_json())
+        self.assertEqual(restored.get_version("v2").id, "v2")
+        self.assertEqual(restored.next_version_id(), "v4")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -187,6 +187,7 @@ export type VersionType = "generation" | "auto-refine" | "regenerate" | "modific
 export interface ModelVersion {
   id: string;
   parentId: string | null;
+  /** ISO 8601 creation time in UTC, ending in "Z" (e.g. "2024-01-01T12:00:00Z"). */
   timestamp: string;
   prompt: string;
   versionType: VersionType;
@@ -196,6 +197,7 @@ export interface ModelVersion {
   pngPath: string | null;
   designerFeedback: string | null;
   approved: boolean;
+  ancestorsPath: string;
 }
 
 /**